@@ -3,9 +3,17 @@ Build script for FreeDTS.
 """
 
 import os
+import json
+import shlex
 import shutil
+import signal
+import hashlib
+import tempfile
+import sysconfig
+import threading
 import subprocess
 from pathlib import Path
+from multiprocessing.pool import ThreadPool
 
 import pybind11
 from pybind11.setup_helpers import Pybind11Extension, build_ext
@@ -17,32 +25,101 @@ SOURCE_DIR = here / "src" / "pyfreedts" / "_cpp" / "dts_src"
 CONVERT_DIR = here / "src" / "pyfreedts" / "_cpp" / "dts_convert"
 GENERATE_DIR = here / "src" / "pyfreedts" / "_cpp" / "dts_generate"
 BIN_DIR = here / "src" / "pyfreedts" / "_bin"
+BUILD_DIR = here / "build" / "freedts"
+PCH_HEADER = here / "src" / "pybind_pch.hpp"
+
+
+def get_max_jobs():
+    """Number of parallel compile jobs, 0, empty or unset MAX_JOBS uses all cores."""
+    max_jobs = os.environ.get("MAX_JOBS", "").strip() or "0"
+    try:
+        max_jobs = int(max_jobs)
+    except ValueError:
+        max_jobs = -1
+
+    if max_jobs < 0:
+        raise RuntimeError(
+            f"MAX_JOBS must be a non-negative integer, got {os.environ['MAX_JOBS']!r}."
+        )
+    return max_jobs or os.cpu_count() or 1
+
+
+# Compile and link flags enabling OpenMP for GCC/Clang, MSVC, AppleClang, and Intel
+OPENMP_FLAGS = [
+    (["-fopenmp"], ["-fopenmp"]),
+    (["/openmp"], []),
+    (["-Xpreprocessor", "-fopenmp"], ["-lomp"]),
+    (["-qopenmp"], ["-qopenmp"]),
+]
+
+OPENMP_TEST = """#include <omp.h>
+int main() {
+#pragma omp parallel
+    { omp_get_thread_num(); }
+    return 0;
+}
+"""
 
 
 def check_openmp_support(compiler):
+    """Return the first (cflags, ldflags) in OPENMP_FLAGS that compile and link."""
     print(f"Checking for OpenMP support with {compiler}...")
 
-    test_file = Path("/tmp/test_openmp.cpp")
-    test_file.write_text("#include <omp.h>\nint main() { return 0; }")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        test_file = Path(tmp_dir) / "test_openmp.cpp"
+        test_file.write_text(OPENMP_TEST)
+
+        for cflags, ldflags in OPENMP_FLAGS:
+            cmd = [*shlex.split(compiler), *cflags, str(test_file), *ldflags]
+            cmd.extend(["-o", str(Path(tmp_dir) / "test_openmp")])
+            try:
+                ret = subprocess.run(
+                    cmd,
+                    check=False,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                )
+            except (subprocess.SubprocessError, OSError):
+                continue
+
+            if ret.returncode == 0:
+                print(f"OpenMP support detected using {' '.join(cflags)}.")
+                return cflags, ldflags
+
+    print("OpenMP support not detected.")
+    return [], []
+
+
+def check_openmp_support_cached(compiler):
+    """Memoized check_openmp_support keyed by the underlying compiler executable."""
+    executable = shutil.which(shlex.split(compiler)[-1])
+    if executable is None:
+        return check_openmp_support(compiler)
+
+    stat = os.stat(executable)
+    key = f"{compiler}:{os.path.realpath(executable)}:{stat.st_mtime}:{stat.st_size}"
+    key = hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    cache_path = BUILD_DIR / "probe_cache.json"
+    cache = {}
+    if cache_path.exists():
+        try:
+            cache = json.loads(cache_path.read_text())
+        except ValueError:
+            pass
 
-    try:
-        ret = subprocess.run(
-            [compiler, "-fopenmp", str(test_file), "-o", "/dev/null"],
-            check=False,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-        if ret.returncode != 0:
-            raise OSError(ret.stderr)
+    if isinstance(cache.get(key), list):
+        cflags, ldflags = cache[key]
+        print(f"OpenMP support detected using {' '.join(cflags)} (cached).")
+        return cflags, ldflags
 
-        print("OpenMP support detected.")
-        return True
-    except (subprocess.SubprocessError, OSError):
-        print("OpenMP support not detected.")
-        return False
-    finally:
-        if test_file.exists():
-            test_file.unlink()
+    # Failed probes are not cached, OpenMP may become available later on
+    cflags, ldflags = check_openmp_support(compiler)
+    if cflags:
+        cache[key] = [cflags, ldflags]
+        os.makedirs(BUILD_DIR, exist_ok=True)
+        cache_path.write_text(json.dumps(cache))
+    return cflags, ldflags
 
 
 def select_compiler():
@@ -78,48 +155,255 @@ def select_compiler():
     raise RuntimeError("No suitable C++ compiler found. Please install g++ or clang++.")
 
 
-def compile_module(source_dir, output_name, compiler, compiler_flags, use_openmp):
-    print(f"Compiling {output_name} from directory: {source_dir}")
+def wrap_ccache(compiler):
+    """Prefix compiler with ccache if available, opt out via PYFREEDTS_NO_CCACHE=1."""
+    if os.environ.get("PYFREEDTS_NO_CCACHE") == "1" or shutil.which("ccache") is None:
+        return compiler
 
-    os.makedirs(BIN_DIR, exist_ok=True)
-    original_dir = os.getcwd()
-    os.chdir(source_dir)
+    # Hash the compiler binary rather than its mtime to survive compiler upgrades
+    os.environ.setdefault("CCACHE_COMPILERCHECK", "content")
+    print(f"Using ccache for {compiler}")
+    return f"ccache {compiler}"
+
+
+def needs_rebuild(obj_file, dep_file):
+    """Check whether obj_file is older than any of the dependencies in dep_file."""
+    if not os.path.exists(obj_file) or not os.path.exists(dep_file):
+        return True
+
+    obj_mtime = os.stat(obj_file).st_mtime
+    with open(dep_file, "r") as f:
+        # Make rule of the form 'target.o: source.cpp header.h \'
+        dependencies = f.read().replace("\\\n", " ").split()[1:]
 
     try:
-        cpp_files = [f for f in os.listdir(".") if f.endswith(".cpp")]
+        return any(os.stat(x).st_mtime > obj_mtime for x in dependencies)
+    except OSError:
+        return True
 
-        if not cpp_files:
-            print(f"No cpp files found in {source_dir}")
-            return
 
-        openmp_flag = "-fopenmp" if use_openmp else ""
-        for cpp_file in cpp_files:
-            cmd = [compiler, "-c"]
-            cmd.extend(compiler_flags.split())
-            if openmp_flag:
-                cmd.extend(openmp_flag.split())
-            cmd.append(cpp_file)
+def ninja_escape(path):
+    """Escape a path for use in a build.ninja file."""
+    return str(path).replace("$", "$$").replace(" ", "$ ").replace(":", "$:")
+
+
+def compile_with_ninja(objects, build_dir, compile_cmd):
+    """Compile the {object: source} pairs in objects using a generated build.ninja."""
+    lines = [
+        f"cxx = {shlex.join(compile_cmd)}",
+        "",
+        "rule cxx",
+        "  command = $cxx -MMD -MF $out.d -c $in -o $out",
+        "  depfile = $out.d",
+        "  deps = gcc",
+        "  description = CXX $out",
+        "",
+    ]
+    for obj_file, cpp_file in objects.items():
+        lines.append(f"build {ninja_escape(obj_file)}: cxx {ninja_escape(cpp_file)}")
+
+    ninja_file = build_dir / "build.ninja"
+    content = "\n".join(lines) + "\n"
+    if not ninja_file.exists() or ninja_file.read_text() != content:
+        ninja_file.write_text(content)
 
+    cmd = ["ninja", "-C", str(build_dir), "-j", str(get_max_jobs())]
+    print(f"Running: {' '.join(cmd)}")
+    subprocess.run(cmd, check=True)
+
+
+def run_parallel(commands, max_jobs):
+    """Run commands with at most max_jobs running at once, raising on failure."""
+    if not hasattr(os, "posix_spawnp"):
+
+        def run_one(cmd):
             print(f"Running: {' '.join(cmd)}")
             subprocess.run(cmd, check=True)
 
-        obj_files = [f for f in os.listdir(".") if f.endswith(".o")]
-        output_path = BIN_DIR / output_name
+        with ThreadPool(max_jobs) as pool:
+            pool.map(run_one, commands)
+        return
 
-        cmd = [compiler]
-        if openmp_flag:
-            cmd.extend(openmp_flag.split())
-        cmd.extend(["-o", str(output_path)])
-        cmd.extend(obj_files)
+    # Spawn compilers directly and wait for each one from its own pool thread
+    lock, running, failed = threading.Lock(), {}, []
 
-        print(f"Running: {' '.join(cmd)}")
-        subprocess.run(cmd, check=True)
+    def run_one(cmd):
+        with lock:
+            if failed:
+                return
+            print(f"Running: {' '.join(cmd)}")
+            try:
+                pid = os.posix_spawnp(cmd[0], cmd, os.environ)
+            except BaseException as e:
+                failed.append(e)
+                raise
+            running[pid] = cmd
+
+        _, status = os.waitpid(pid, 0)
+        if os.WIFSIGNALED(status):
+            returncode = -os.WTERMSIG(status)
+        else:
+            returncode = os.WEXITSTATUS(status)
+
+        with lock:
+            del running[pid]
+            if returncode != 0 and not failed:
+                failed.append(subprocess.CalledProcessError(returncode, cmd))
+
+    with ThreadPool(max_jobs) as pool:
+        try:
+            pool.map(run_one, commands)
+        except BaseException as e:
+            # Stop spawning, kill running compilers and let their threads reap them
+            with lock:
+                failed.append(e)
+                for pid in running:
+                    try:
+                        os.kill(pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        # Already reaped by its thread, which is waiting for the lock
+                        pass
+            pool.close()
+            pool.join()
+            raise
+
+    if failed:
+        raise failed[0]
+
+
+def compile_with_pool(objects, build_dir, compile_cmd):
+    """Compile the {object: source} pairs in objects, skipping up to date ones."""
+
+    # Objects compiled with different flags can not be reused
+    flags_file = build_dir / ".build_flags"
+    build_flags = " ".join(compile_cmd)
+    rebuild_all = os.environ.get("PYFREEDTS_CLEAN") == "1"
+    if not flags_file.exists() or flags_file.read_text() != build_flags:
+        rebuild_all = True
+
+    stale_objects = [
+        x for x in objects if rebuild_all or needs_rebuild(x, x.with_suffix(".d"))
+    ]
 
-        os.chmod(output_path, 0o755)
-        print(f"{output_name} compiled successfully and placed in {BIN_DIR}")
+    commands = []
+    for obj_file in stale_objects:
+        os.makedirs(obj_file.parent, exist_ok=True)
+        cmd = [*compile_cmd, "-MMD", "-MF", str(obj_file.with_suffix(".d"))]
+        cmd.extend(["-c", str(objects[obj_file]), "-o", str(obj_file)])
+        commands.append(cmd)
+
+    # Translation units are independent, only the link step has to wait
+    run_parallel(commands, get_max_jobs())
+    flags_file.write_text(build_flags)
+
+
+def compile_objects(source_dir, build_dir, compiler, compiler_flags, openmp_cflags):
+    """Compile all .cpp files in source_dir to objects in build_dir."""
+    print(f"Compiling objects in directory: {source_dir}")
+
+    source_dir, build_dir = Path(source_dir), Path(build_dir)
+    os.makedirs(build_dir, exist_ok=True)
+
+    cpp_files = [Path(f) for f in find_cpp_files(source_dir)]
+    if not cpp_files:
+        print(f"No cpp files found in {source_dir}")
+        return []
+
+    # Objects mirror the source tree, so equally named sources do not collide
+    objects = {
+        build_dir / x.relative_to(source_dir).with_suffix(".o"): x for x in cpp_files
+    }
+
+    # Remove objects whose source file no longer exists
+    directories = [str(build_dir)]
+    while directories:
+        with os.scandir(directories.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                elif entry.name.endswith(".o") and Path(entry.path) not in objects:
+                    os.remove(entry.path)
+
+    compile_cmd = [*shlex.split(compiler), *compiler_flags.split(), *openmp_cflags]
+    if shutil.which("ninja") is not None:
+        compile_with_ninja(objects, build_dir, compile_cmd)
+    else:
+        compile_with_pool(objects, build_dir, compile_cmd)
+
+    return list(objects)
+
+
+def link_binary(obj_files, output_path, compiler, openmp_ldflags):
+    """Link obj_files into the executable output_path unless it is up to date."""
+    output_path = Path(output_path)
+    cmd = shlex.split(compiler)
+    cmd.extend(["-o", str(output_path)])
+    cmd.extend(str(x) for x in obj_files)
+    cmd.extend(openmp_ldflags)
+
+    # Removed objects or changed flags require a relink even if no object is newer
+    link_file = Path(obj_files[0]).parent / ".link_cmd"
+    link_cmd = " ".join(cmd)
+    if (
+        output_path.exists()
+        and link_file.exists()
+        and link_file.read_text() == link_cmd
+    ):
+        output_mtime = output_path.stat().st_mtime
+        if all(x.stat().st_mtime <= output_mtime for x in obj_files):
+            print(f"{output_path.name} is up to date")
+            return
 
-    finally:
-        os.chdir(original_dir)
+    os.makedirs(output_path.parent, exist_ok=True)
+    print(f"Running: {' '.join(cmd)}")
+    subprocess.run(cmd, check=True)
+    link_file.write_text(link_cmd)
+
+    os.chmod(output_path, 0o755)
+    print(
+        f"{output_path.name} compiled successfully and placed in {output_path.parent}"
+    )
+
+
+def compile_pch(compiler, compile_args):
+    """Precompile PCH_HEADER into BUILD_DIR and return the flags for using it."""
+    if shlex.split(compiler)[0] == "ccache":
+        sloppiness = os.environ.get("CCACHE_SLOPPINESS", "").split(",")
+        if not {"pch_defines", "time_macros"}.issubset(sloppiness):
+            print("Skipping precompiled header, ccache requires CCACHE_SLOPPINESS.")
+            return []
+
+    pch_dir = BUILD_DIR / "pch"
+    pch_file = pch_dir / f"{PCH_HEADER.name}.gch"
+    dep_file = pch_dir / f"{PCH_HEADER.name}.d"
+
+    # The header is only used if compiled with the same flags as the extension
+    cmd = [*shlex.split(compiler), "-x", "c++-header"]
+    for flags in ("CFLAGS", "CCSHARED"):
+        cmd.extend(shlex.split(sysconfig.get_config_var(flags) or ""))
+    for flags in ("CFLAGS", "CPPFLAGS"):
+        cmd.extend(shlex.split(os.environ.get(flags, "")))
+    cmd.extend(["-I", sysconfig.get_paths()["include"], "-I", pybind11.get_include()])
+    cmd.extend(["-fvisibility=hidden", "-g0", *compile_args])
+    cmd.extend(["-MMD", "-MF", str(dep_file), str(PCH_HEADER), "-o", str(pch_file)])
+
+    flags_file = pch_dir / ".build_flags"
+    build_flags = " ".join(cmd)
+    if (
+        not flags_file.exists()
+        or flags_file.read_text() != build_flags
+        or needs_rebuild(pch_file, dep_file)
+    ):
+        os.makedirs(pch_dir, exist_ok=True)
+        print(f"Running: {' '.join(cmd)}")
+        if subprocess.run(cmd, check=False).returncode != 0:
+            print("Precompiling headers failed, continuing without.")
+            return []
+        flags_file.write_text(build_flags)
+
+    # The compiler picks up the .gch from pch_dir before the header from its source
+    include_dirs = ["-I", str(pch_dir), "-I", str(PCH_HEADER.parent)]
+    return [*include_dirs, "-include", PCH_HEADER.name, "-Winvalid-pch"]
 
 
 def find_cpp_files(directory):
@@ -131,39 +415,63 @@ def find_cpp_files(directory):
         print(f"Warning: Directory {directory} does not exist")
         return cpp_files
 
-    for cpp_file in directory.rglob("*.cpp"):
-        cpp_files.append(str(cpp_file))
-        print(f"Found C++ source: {cpp_file.relative_to(directory)}")
+    # scandir provides file types from the directory listing without a stat call
+    directories = [str(directory)]
+    while directories:
+        with os.scandir(directories.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                elif entry.name.endswith(".cpp"):
+                    cpp_files.append(entry.path)
+                    print(f"Found C++ source: {os.path.relpath(entry.path, directory)}")
 
     return cpp_files
 
 
 def build(setup_kwargs):
     # Compile standalone modules
-    compiler = select_compiler()
-    compiler_flags = "-O3 -std=c++11"
-    use_openmp = check_openmp_support(compiler)
-
-    if os.path.exists(BIN_DIR):
-        shutil.rmtree(BIN_DIR)
-    os.makedirs(BIN_DIR, exist_ok=True)
-
-    compile_module(SOURCE_DIR, "DTS", compiler, compiler_flags, use_openmp)
-    compile_module(CONVERT_DIR, "CNV", compiler, compiler_flags, use_openmp)
-    compile_module(GENERATE_DIR, "GEN", compiler, compiler_flags, use_openmp)
-
-    # Compile bindings
-    source_files = find_cpp_files(SOURCE_DIR)
-    if not source_files:
+    compiler = wrap_ccache(select_compiler())
+
+    # Position independent code allows reusing the DTS objects for the bindings
+    compiler_flags = "-O3 -std=c++11 -fPIC"
+
+    if os.environ.get("PYFREEDTS_CLEAN") == "1":
+        shutil.rmtree(BIN_DIR, ignore_errors=True)
+        shutil.rmtree(BUILD_DIR, ignore_errors=True)
+
+    openmp_cflags, openmp_ldflags = check_openmp_support_cached(compiler)
+
+    modules = {"DTS": SOURCE_DIR, "CNV": CONVERT_DIR, "GEN": GENERATE_DIR}
+    module_objects = {}
+    for name, source_dir in modules.items():
+        obj_files = compile_objects(
+            source_dir,
+            BUILD_DIR / f"objs_{name}",
+            compiler,
+            compiler_flags,
+            openmp_cflags,
+        )
+        if obj_files:
+            link_binary(obj_files, BIN_DIR / name, compiler, openmp_ldflags)
+        module_objects[name] = obj_files
+
+    # Compile bindings with the same toolchain and link the DTS objects
+    os.environ.setdefault("CC", compiler)
+    os.environ.setdefault("CXX", compiler)
+    dts_objects = [str(x) for x in module_objects["DTS"]]
+    if not dts_objects:
         print("Warning: No C++ source files found. Skipping Python bindings.")
         return None
 
+    compile_args = ["-O3", "-std=c++11"]
+    pch_args = compile_pch(os.environ["CC"], compile_args)
+
     ext_modules = [
         Pybind11Extension(
             "pyfreedts._core",
             [
                 str(here / "src" / "bindings.cpp"),
-                *source_files,
             ],
             include_dirs=[
                 str(SOURCE_DIR),
@@ -173,7 +481,10 @@ def build(setup_kwargs):
             define_macros=[
                 ("VERSION_INFO", '"dev"'),
             ],
-            extra_compile_args=["-O3", "-std=c++11"],
+            extra_compile_args=[*compile_args, *pch_args],
+            extra_objects=dts_objects,
+            extra_link_args=openmp_ldflags,
+            depends=dts_objects,
         ),
     ]
 
@@ -0,0 +1,5 @@
+// Precompiled header for the pybind11 bindings in bindings.cpp
+
+#include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
+#include <pybind11/stl.h>
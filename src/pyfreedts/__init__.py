@@ -1,5 +1,13 @@
-from .mesh import Mesh
 from .cli import run_gen, run_cnv, run_dts, run_dts_screen
 
 
 __all__ = ["run_dts", "run_cnv", "run_gen", "run_dts_screen", "Mesh"]
+
+
+def __getattr__(name):
+    # Mesh pulls in numpy and the compiled extension, which the CLIs do not need
+    if name == "Mesh":
+        from .mesh import Mesh
+
+        return Mesh
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,7 +2,8 @@
 Execution backends for parameter screens.
 """
 
-import datetime
+import sys
+import shlex
 import subprocess
 
 from sys import exit
@@ -62,14 +63,14 @@ class SnakemakeBackend:
         except Exception:
             pass
 
-        resource_spec = ",".join({f"{k}={v}" for k, v in self.resources.items()})
+        # Sorted so identical screens produce identical Snakefiles
+        resource_spec = ", ".join(f"{k}={v}" for k, v in sorted(self.resources.items()))
 
         filtered_args = " ".join(filtered_args)
         run_ids = [run["run_id"] for run in self.runs]
         snakefile_content = dedent(
             f'''
             # Auto-generated Snakefile for DTS parameter screen
-            # Generated on {datetime.datetime.now().isoformat()}
 
             import json
             from pathlib import Path
@@ -119,22 +120,13 @@ class SnakemakeBackend:
     def run(self) -> bool:
         """Execute the Snakemake workflow using CLI with streaming output."""
         cmd = ["snakemake", "-s", str(self.snakefile_path)]
-        cmd.append(self.backend_args)
-        cmd_str = " ".join([str(x) for x in cmd])
-
-        # I really would prefer using the Python API, but this is easier for now
-        process = subprocess.Popen(
-            cmd_str,
-            shell=True,
-            cwd=str(self.output_dir),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            universal_newlines=True,
-            bufsize=1,
-        )
-        for line in iter(process.stdout.readline, ""):
-            print(line, end="")
-        return process.wait()
+        cmd.extend(shlex.split(self.backend_args))
+
+        # I really would prefer using the Python API, but this is easier for now.
+        # Snakemake writes to our stdout directly, which streams without a copy
+        sys.stdout.flush()
+        process = subprocess.run(cmd, cwd=str(self.output_dir))
+        return process.returncode
 
 
 BACKENDS = {
@@ -1,5 +1,6 @@
 from typing import Tuple
 from pathlib import Path
+from functools import cached_property
 
 import numpy as np
 
@@ -51,6 +52,13 @@ class Mesh:
         inclusions, _ = self.get_vertex_inclusion_mapping()
         return inclusions
 
+    @cached_property
+    def _curvatures(self) -> np.ndarray:
+        """Read-only (N, 2) principal curvatures, cached since meshes are immutable."""
+        curvatures = np.asarray(self._mesh.get_vertex_curvatures())
+        curvatures.flags.writeable = False
+        return curvatures
+
     def get_curvatures(self) -> Tuple[np.ndarray, np.ndarray]:
         """
         Get principal curvatures for all vertices.
@@ -62,8 +70,8 @@ class Mesh:
         k2 : np.ndarray
             Second principal curvature for each vertex
         """
-        curvatures = self._mesh.get_vertex_curvatures()
-        return curvatures[:, 0], curvatures[:, 1]
+        curvatures = self._curvatures
+        return curvatures[:, 0].copy(), curvatures[:, 1].copy()
 
     def get_mean_curvatures(self) -> np.ndarray:
         """
@@ -74,8 +82,8 @@ class Mesh:
         np.ndarray
             Mean curvature for each vertex
         """
-        k1, k2 = self.get_curvatures()
-        return (k1 + k2) / 2
+        curvatures = self._curvatures
+        return 0.5 * (curvatures[:, 0] + curvatures[:, 1])
 
     def get_gaussian_curvatures(self) -> np.ndarray:
         """
@@ -86,8 +94,8 @@ class Mesh:
         np.ndarray
             Gaussian curvature for each vertex
         """
-        k1, k2 = self.get_curvatures()
-        return k1 * k2
+        curvatures = self._curvatures
+        return curvatures[:, 0] * curvatures[:, 1]
 
     def get_vertex_normals(self) -> np.ndarray:
         """
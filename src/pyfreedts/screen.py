@@ -2,17 +2,47 @@
 Parameter screen functionality for pyFreeDTS.
 """
 
+import os
 import re
 import json
+import math
 import argparse
-from itertools import product
+from operator import mul
+from functools import reduce, lru_cache
+from itertools import islice, product
+from concurrent.futures import ThreadPoolExecutor
 
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Tuple, Iterable, Iterator
+
+import numpy as np
 
 from .execution import BACKENDS
 
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+except ImportError:
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2).encode("utf-8")
+
+
+def _write_if_changed(path: Path, data: bytes) -> bool:
+    """Write data to path unless it already has that content, keeping its mtime."""
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+
+    path.write_bytes(data)
+    return True
+
 
 class ParameterParser:
     """Parse parameter definitions from template files."""
@@ -32,21 +62,21 @@ class ParameterParser:
         Returns:
             Tuple of (template_with_placeholders, parameter_definitions)
         """
-        parameters = {}
-
-        def replace_param(match):
-            param_name = match.group(1)
-            param_def = match.group(2)
-
-            # Parse parameter definition
-            param_values = cls._parse_parameter_definition(param_def)
-            parameters[param_name] = param_values
+        template_processed, parameters = cls._parse_template(template_content)
+        return template_processed, {name: list(values) for name, values in parameters}
 
-            # Replace with simple placeholder for later substitution
-            return f"{{{param_name}}}"
+    @classmethod
+    @lru_cache(maxsize=32)
+    def _parse_template(cls, template_content: str) -> Tuple[str, Tuple]:
+        """Cached implementation of parse_template returning immutable values."""
+        parameters = {}
+        for match in cls.PARAM_PATTERN.finditer(template_content):
+            param_name, param_def = match.group(1), match.group(2)
+            parameters[param_name] = tuple(cls._parse_parameter_definition(param_def))
 
-        template_processed = cls.PARAM_PATTERN.sub(replace_param, template_content)
-        return template_processed, parameters
+        # Replace with simple placeholder for later substitution
+        template_processed = cls.PARAM_PATTERN.sub(r"{\1}", template_content)
+        return template_processed, tuple(parameters.items())
 
     @classmethod
     def _parse_parameter_definition(cls, param_def: str) -> List[float]:
@@ -73,13 +103,10 @@ class ParameterParser:
             if step <= 0:
                 raise ValueError(f"Step size must be positive, got: {step}")
 
-            # Generate range values
-            values = []
-            current = start
-            while current <= end + 1e-10:
-                values.append(current)
-                current += step
-            return values
+            # Compute values from the index rather than summing up steps to
+            # avoid accumulating floating point errors
+            n_values = max(int(math.floor((end - start) / step + 1e-9)) + 1, 0)
+            return (start + step * np.arange(n_values, dtype=float)).tolist()
 
         elif "," in param_def:
             # List definition: val1,val2,val3
@@ -94,6 +121,8 @@ class ParameterParser:
 class ScreenGenerator:
     """Generate parameter combinations and file structure for screens."""
 
+    PLACEHOLDER_PATTERN = re.compile(r"\{(\w+)\}")
+
     def __init__(self, template_file: Path, output_dir: Path):
         self.output_dir = output_dir
         self.template_content = None
@@ -111,70 +140,83 @@ class ScreenGenerator:
 
         self.template_file = template_file
 
-    def _generate_parameter_combinations(self) -> List[Dict[str, float]]:
-        """Generate all parameter combinations."""
+    def _generate_parameter_combinations(self) -> Iterator[Dict[str, float]]:
+        """Lazily generate all parameter combinations."""
         # Sort parameter names for consistent ordering
         param_names = sorted(self.parameters.keys())
         param_values = [self.parameters[name] for name in param_names]
 
-        combinations = []
-        for combo in product(*param_values):
-            param_dict = dict(zip(param_names, combo))
-            combinations.append(param_dict)
-
-        return combinations
+        return (dict(zip(param_names, combo)) for combo in product(*param_values))
 
     def _substitute_parameters(self, params: Dict[str, float]) -> str:
         """Substitute parameter values into template."""
-        content = self.template_content
-        for param_name, value in params.items():
-            placeholder = f"{{{param_name}}}"
-            content = content.replace(placeholder, str(value))
-        return content
-
-    def setup(self):
-        """Setup parameter screen directory"""
+
+        def replace_placeholder(match):
+            param_name = match.group(1)
+            if param_name not in params:
+                return match.group(0)
+            return str(params[param_name])
+
+        # Single pass over the template rather than one per parameter
+        return self.PLACEHOLDER_PATTERN.sub(replace_placeholder, self.template_content)
+
+    def setup(self) -> Dict[str, Any]:
+        """Setup parameter screen directory and return the screen summary"""
         combinations = self._generate_parameter_combinations()
         runs = self._create_run_directories(combinations)
-        self._create_summary_metadata(runs)
+        return self._create_summary_metadata(runs)
 
     def _create_run_directories(
-        self, combinations: List[Dict[str, float]]
+        self, combinations: Iterable[Dict[str, float]]
     ) -> List[Dict[str, Any]]:
         """Create run directories and metadata."""
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
         # This is a simplification for now. We could think about creating directory names
         # as hexdigest of the parameter combination to avoid potential collisions
-        total_runs = len(combinations)
+        total_runs = reduce(mul, (len(x) for x in self.parameters.values()), 1)
         width = min(len(str(total_runs)), 4)
 
-        runs = []
-        for i, params in enumerate(combinations, 1):
-            run_id = f"run_{i:0{width}d}"
-            run_dir = self.output_dir / run_id
-            run_dir.mkdir(exist_ok=True)
-
-            input_content = self._substitute_parameters(params)
-            input_file = run_dir / "input.dts"
-            with open(input_file, "w") as f:
-                f.write(input_content)
-
-            params_file = run_dir / "params.json"
-            with open(params_file, "w") as f:
-                json.dump(params, f, indent=2)
-
-            run_info = {
-                "run_id": run_id,
-                "run_dir": str(run_dir),
-                "parameters": params,
-                "input_file": str(input_file),
-            }
-            runs.append(run_info)
-
+        # Runs are independent and creating them is dominated by file system calls
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        # Executor.map would consume all combinations upfront, so submit in batches
+        runs, combinations = [], enumerate(combinations, 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                batch = list(islice(combinations, max_workers * 4))
+                if not batch:
+                    break
+                runs.extend(
+                    executor.map(
+                        lambda x: self._create_run_directory(*x, width=width), batch
+                    )
+                )
         return runs
 
-    def _create_summary_metadata(self, runs: List[Dict[str, Any]]):
+    def _create_run_directory(
+        self, index: int, params: Dict[str, float], width: int
+    ) -> Dict[str, Any]:
+        """Create a single run directory and return its metadata."""
+        run_id = f"run_{index:0{width}d}"
+        run_dir = self.output_dir / run_id
+        run_dir.mkdir(exist_ok=True)
+
+        input_content = self._substitute_parameters(params)
+        # Unchanged files are not rewritten to keep snakemake from rerunning them
+        input_file = run_dir / "input.dts"
+        _write_if_changed(input_file, input_content.encode("utf-8"))
+
+        params_file = run_dir / "params.json"
+        _write_if_changed(params_file, _dumps(params))
+
+        return {
+            "run_id": run_id,
+            "run_dir": str(run_dir),
+            "parameters": params,
+            "input_file": str(input_file),
+        }
+
+    def _create_summary_metadata(self, runs: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Create master summary file."""
         summary = {
             "template_file": str(self.template_file),
@@ -197,8 +239,8 @@ class ScreenGenerator:
         }
 
         summary_file = self.output_dir / "screen_summary.json"
-        with open(summary_file, "w") as f:
-            json.dump(summary, f, indent=2)
+        summary_file.write_bytes(_dumps(summary))
+        return summary
 
 
 def _parse_key_value_str(value: str) -> Dict:
@@ -263,10 +305,7 @@ def main():
     template_path = Path(args.template_file).absolute()
     output_path = Path(args.output_dir).absolute()
 
-    ScreenGenerator(template_path, output_path).setup()
-    summary_file = output_path / "screen_summary.json"
-    with open(summary_file, "r") as f:
-        summary = json.load(f)
+    summary = ScreenGenerator(template_path, output_path).setup()
 
     backend_class = BACKENDS[args.backend]
     executor = backend_class(
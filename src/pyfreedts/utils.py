@@ -4,95 +4,263 @@ Utility functions for pyFreeDTS.
 
 import os
 import sys
+import atexit
+import signal
+import threading
 import subprocess
-import importlib.resources
 
 from pathlib import Path
+from functools import lru_cache
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
+# The binaries are installed next to this module, see the build script
+_BIN_DIR = Path(__file__).parent / "_bin"
+_BIN_PATHS = {name: _BIN_DIR / name for name in ("DTS", "CNV", "GEN")}
+
+# Signals Python ignores, which children should see with default handling again
+_DEFAULT_SIGNALS = tuple(
+    getattr(signal, name) for name in ("SIGPIPE", "SIGXFSZ") if hasattr(signal, name)
+)
+
+# Binaries known to be executable in this process
+_EXECUTABLE = set()
+
+
+@lru_cache(maxsize=8)
 def get_binary_path(binary_name):
     """
-    Get the path to the specified binary using Python's package resource system.
+    Get the path to the specified binary in the installed package.
+    Lookups are cached, since the installed binaries do not move at runtime.
     Args:
         binary_name (str): Name of the binary ('DTS', 'CNV', or 'GEN')
     Returns:
         Path: Path to the binary
     """
-    try:
-        bin_dir = importlib.resources.files("pyfreedts._bin")
-        binary_path = bin_dir / binary_name
-        if binary_path.exists():
-            return binary_path
-    except (ImportError, AttributeError, TypeError):
-        # Fallback for older Python versions or if the above method fails
-        try:
-            import pkg_resources
-
-            binary_path = Path(
-                pkg_resources.resource_filename("pyfreedts._bin", binary_name)
-            )
-            if binary_path.exists():
-                return binary_path
-        except (ImportError, pkg_resources.DistributionNotFound):
-            pass
-
-    module_path = Path(__file__).parent
-    binary_path = module_path / "_bin" / binary_name
-    if not binary_path.exists():
+    binary_path = _BIN_PATHS.get(binary_name)
+    if binary_path is None or not os.access(binary_path, os.F_OK):
         raise FileNotFoundError(
             f"Binary {binary_name} not found. Make sure the package is properly installed."
         )
     return binary_path
 
 
+@lru_cache(maxsize=8)
+def _binary_exe(binary_name):
+    """Return the absolute, symlink-free path string handed to exec for a binary."""
+    return os.path.realpath(get_binary_path(binary_name))
+
+
+def _exit_code(status):
+    """Convert a waitpid status into a subprocess-style return code."""
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def _spawn(cmd, output_fd=None):
+    """Run cmd to completion and return its return code.
+
+    If output_fd is given, the child's stdout and stderr are redirected to it.
+    """
+    if hasattr(os, "posix_spawn"):
+        file_actions = ()
+        if output_fd is not None:
+            file_actions = [
+                (os.POSIX_SPAWN_DUP2, output_fd, 1),
+                (os.POSIX_SPAWN_DUP2, output_fd, 2),
+            ]
+        pid = os.posix_spawn(
+            cmd[0],
+            cmd,
+            os.environ,
+            file_actions=file_actions,
+            setsigdef=_DEFAULT_SIGNALS,
+        )
+        try:
+            return _exit_code(os.waitpid(pid, 0)[1])
+        except BaseException:
+            # Do not leave the child running, e.g. after a KeyboardInterrupt,
+            # unless the interrupt arrived after it had already been reaped
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            raise
+
+    process = subprocess.Popen(cmd, stdout=output_fd, stderr=output_fd, close_fds=False)
+    try:
+        return process.wait()
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+
+
 def run_binary(binary_name, args=None):
     """
     Run the specified binary with the given arguments.
+
+    The binary is launched with posix_spawn where available, which avoids
+    duplicating the page tables of large Python processes on every launch.
+    glibc implements it with CLONE_VFORK, so launches cost about as much as
+    vfork and execve without running Python code in the shared address space.
+    Args:
+        binary_name (str): Name of the binary ('DTS', 'CNV', or 'GEN')
+        args (list): List of command-line arguments
+    Returns:
+        int: Return code of the process
+    """
+    return _run_binary(binary_name, args)
+
+
+def run_binary_to_file(binary_name, args, log_path):
+    """
+    Run the specified binary with its stdout and stderr written to a file.
+
+    The log file becomes the child's stdout and stderr, so the output never
+    passes through Python.
     Args:
         binary_name (str): Name of the binary ('DTS', 'CNV', or 'GEN')
         args (list): List of command-line arguments
+        log_path (str or Path): File to write the output to, truncated first
     Returns:
         int: Return code of the process
     """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0)
+    log_fd = os.open(log_path, flags, 0o644)
+    try:
+        return _run_binary(binary_name, args, log_fd)
+    finally:
+        os.close(log_fd)
+
+
+def _run_binary(binary_name, args=None, output_fd=None):
     if args is None:
         args = []
 
-    binary_path = get_binary_path(binary_name)
-    os.chmod(binary_path, 0o755)
-    cmd = [str(binary_path)] + args
-    try:
-        process = subprocess.run(cmd, check=True)
-        return process.returncode
-    except subprocess.CalledProcessError as e:
+    binary_path = _binary_exe(binary_name)
+    if binary_path not in _EXECUTABLE:
+        if not os.access(binary_path, os.X_OK):
+            os.chmod(binary_path, 0o755)
+        _EXECUTABLE.add(binary_path)
+    cmd = [binary_path] + args
+    returncode = _spawn(cmd, output_fd)
+    if returncode != 0:
+        e = subprocess.CalledProcessError(returncode, cmd)
         print(f"Error running {binary_name}: {e}", file=sys.stderr)
-        return e.returncode
+    return returncode
 
 
-@contextmanager
-def suppress_stdout_stderr():
-    """Context manager to suppress all stdout and stderr output at the file descriptor level."""
-    original_stdout_fd = os.dup(1)
-    original_stderr_fd = os.dup(2)
+def run_binaries_parallel(specs, max_workers=None):
+    """
+    Run several binaries concurrently.
+    Args:
+        specs (list): (binary_name, args) tuples, as passed to run_binary
+        max_workers (int): Maximum number of concurrent processes, defaults to
+            the number of CPUs
+    Returns:
+        list: Return codes of the processes, in the order of specs
+    """
+    with ThreadPoolExecutor(max_workers or os.cpu_count()) as executor:
+        return list(executor.map(lambda spec: run_binary(*spec), specs))
 
+
+def prewarm_fd_table(target=1024):
+    """
+    Grow the file descriptor table before launching many binaries.
+
+    The kernel grows the table lazily, and growing it in a process with many
+    open descriptors can stall the next launch. Calling this once up front
+    moves that cost out of the first run_binary call. Failures are ignored,
+    e.g. when target exceeds the open file limit.
+    Args:
+        target (int): Number of descriptors the table should hold
+    """
+    fd = os.open(os.devnull, os.O_RDONLY)
+    dups = []
+    try:
+        if hasattr(fcntl, "F_DUPFD_CLOEXEC"):
+            dups.append(fcntl.fcntl(fd, fcntl.F_DUPFD_CLOEXEC, target - 1))
+        else:
+            while not dups or dups[-1] < target - 1:
+                dups.append(os.dup(fd))
+    except OSError:
+        pass
+    finally:
+        for dup in dups:
+            os.close(dup)
+        os.close(fd)
+
+
+@lru_cache(maxsize=1)
+def _devnull():
+    """Return a /dev/null fd and file object, opened once and closed at exit."""
     devnull_fd = os.open(os.devnull, os.O_WRONLY)
+    devnull = os.fdopen(devnull_fd, "w", closefd=False)
+    atexit.register(_close_devnull)
+    return devnull_fd, devnull
+
+
+def _close_devnull():
+    devnull_fd, devnull = _devnull()
+    devnull.close()
+    os.close(devnull_fd)
+
+
+def _redirect_to_devnull():
+    """Send fds 1 and 2 and sys.stdout/stderr to /dev/null, returning the old ones."""
+    devnull_fd, devnull = _devnull()
+    saved = (os.dup(1), os.dup(2), sys.stdout, sys.stderr)
     try:
         os.dup2(devnull_fd, 1)
         os.dup2(devnull_fd, 2)
+    except OSError:
+        _restore_output(saved)
+        raise
+
+    sys.stdout = devnull
+    sys.stderr = devnull
+    return saved
+
+
+def _restore_output(saved):
+    original_stdout_fd, original_stderr_fd, sys.stdout, sys.stderr = saved
+    os.dup2(original_stdout_fd, 1)
+    os.dup2(original_stderr_fd, 2)
+
+    os.close(original_stdout_fd)
+    os.close(original_stderr_fd)
 
-        old_stdout = sys.stdout
-        old_stderr = sys.stderr
-        with open(os.devnull, "w") as devnull:
-            sys.stdout = devnull
-            sys.stderr = devnull
-            yield
-    finally:
-        os.dup2(original_stdout_fd, 1)
-        os.dup2(original_stderr_fd, 2)
 
-        sys.stdout = old_stdout
-        sys.stderr = old_stderr
+# File descriptors are shared by all threads, so suppression is tracked per process
+_SUPPRESS_LOCK = threading.Lock()
+_SUPPRESS_STATE = {"depth": 0, "saved": None}
 
-        os.close(devnull_fd)
-        os.close(original_stdout_fd)
-        os.close(original_stderr_fd)
+
+@contextmanager
+def suppress_stdout_stderr():
+    """
+    Context manager to suppress all stdout and stderr output at the file descriptor level.
+
+    Nested and concurrent uses share one redirection, which is set up by the
+    first entry and undone by the last exit.
+    """
+    with _SUPPRESS_LOCK:
+        if _SUPPRESS_STATE["depth"] == 0:
+            _SUPPRESS_STATE["saved"] = _redirect_to_devnull()
+        _SUPPRESS_STATE["depth"] += 1
+    try:
+        yield
+    finally:
+        with _SUPPRESS_LOCK:
+            _SUPPRESS_STATE["depth"] -= 1
+            if _SUPPRESS_STATE["depth"] == 0:
+                _restore_output(_SUPPRESS_STATE["saved"])
+                _SUPPRESS_STATE["saved"] = None
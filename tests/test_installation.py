@@ -1,9 +1,9 @@
+import pytest
+
 import pyfreedts
 
 
-def test_run_functions():
+@pytest.mark.parametrize("name", ["run_dts", "run_cnv", "run_gen", "run_dts_screen"])
+def test_run_functions(name):
     """Test that the run functions exist."""
-    assert callable(pyfreedts.run_dts), "run_dts is not callable"
-    assert callable(pyfreedts.run_cnv), "run_cnv is not callable"
-    assert callable(pyfreedts.run_gen), "run_gen is not callable"
-    assert callable(pyfreedts.run_dts_screen), "run_dts_screen is not callable"
+    assert callable(getattr(pyfreedts, name)), f"{name} is not callable"
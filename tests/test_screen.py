@@ -0,0 +1,84 @@
+import os
+import json
+
+import pytest
+
+from pyfreedts.screen import ParameterParser, ScreenGenerator
+
+
+def test_parse_range():
+    """Test that ranges include the end point without accumulating errors."""
+    values = ParameterParser._parse_parameter_definition("0.0:1.0:0.1")
+    assert len(values) == 11
+    assert values[-1] == 1.0
+    assert all(isinstance(x, float) for x in values)
+
+    assert ParameterParser._parse_parameter_definition("25:35:5") == [25, 30, 35]
+    assert ParameterParser._parse_parameter_definition("2:1:1") == []
+
+
+def test_parse_invalid_range():
+    """Test that invalid range definitions are rejected."""
+    with pytest.raises(ValueError):
+        ParameterParser._parse_parameter_definition("0:1:0")
+    with pytest.raises(ValueError):
+        ParameterParser._parse_parameter_definition("0:1")
+
+
+def test_parse_template():
+    """Test that parsed templates can be modified without affecting the cache."""
+    template = "Kappa = {{kappa:1,2}} 0\nTemp = {{temp:1.0}}\n"
+
+    content, parameters = ParameterParser.parse_template(template)
+    assert content == "Kappa = {kappa} 0\nTemp = {temp}\n"
+    assert parameters == {"kappa": ["1", "2"], "temp": ["1.0"]}
+
+    parameters["kappa"].append("3")
+    assert ParameterParser.parse_template(template)[1]["kappa"] == ["1", "2"]
+
+
+def test_substitute_parameters(tmp_path):
+    """Test that only placeholders of known parameters are substituted."""
+    template = tmp_path / "input.dts"
+    template.write_text("Kappa = {{kappa:1,2}} 0 {other}\nSteps = {{steps:10}}\n")
+
+    generator = ScreenGenerator(template, tmp_path / "screen")
+    content = generator._substitute_parameters({"kappa": "1", "steps": "10"})
+    assert content == "Kappa = 1 0 {other}\nSteps = 10\n"
+
+
+def test_setup(tmp_path):
+    """Test that setup creates one directory per parameter combination."""
+    template = tmp_path / "input.dts"
+    template.write_text("Kappa = {{kappa:1,2}} 0\nSteps = {{steps:10:20:10}}\n")
+
+    output_dir = tmp_path / "screen"
+    summary = ScreenGenerator(template, output_dir).setup()
+    assert summary == json.loads((output_dir / "screen_summary.json").read_text())
+    assert summary["total_runs"] == 4
+    assert [run["run_id"] for run in summary["runs"]] == [f"run_{i}" for i in "1234"]
+
+    run_dir = output_dir / "run_4"
+    assert json.loads((run_dir / "params.json").read_text()) == {
+        "kappa": "2",
+        "steps": 20.0,
+    }
+    assert (run_dir / "input.dts").read_text() == "Kappa = 2 0\nSteps = 20.0\n"
+
+
+def test_setup_keeps_unchanged_files(tmp_path):
+    """Test that repeating setup does not rewrite unchanged run files."""
+    template = tmp_path / "input.dts"
+    template.write_text("Kappa = {{kappa:1,2}} 0\n")
+
+    output_dir = tmp_path / "screen"
+    ScreenGenerator(template, output_dir).setup()
+    input_file = output_dir / "run_1" / "input.dts"
+    os.utime(input_file, ns=(0, 0))
+
+    ScreenGenerator(template, output_dir).setup()
+    assert input_file.stat().st_mtime_ns == 0
+
+    template.write_text("Kappa = {{kappa:1,2}} 1\n")
+    ScreenGenerator(template, output_dir).setup()
+    assert input_file.read_text() == "Kappa = 1 1\n"
@@ -0,0 +1,153 @@
+import os
+import sys
+import shutil
+import signal
+import threading
+
+import pytest
+
+from pyfreedts import utils
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "posix_spawn") or not os.path.exists("/proc/self/status"),
+    reason="Requires posix_spawn and /proc",
+)
+def test_spawn_restores_default_signals(tmp_path):
+    """Test that children do not inherit the signals Python ignores."""
+    log_path = tmp_path / "status"
+    log_fd = os.open(log_path, os.O_WRONLY | os.O_CREAT)
+    try:
+        cmd = [shutil.which("cat"), "/proc/self/status"]
+        assert utils._spawn(cmd, log_fd) == 0
+    finally:
+        os.close(log_fd)
+
+    status = dict(
+        line.split(":", 1) for line in log_path.read_text().splitlines() if ":" in line
+    )
+    ignored = int(status["SigIgn"], 16)
+    for signum in (signal.SIGPIPE, signal.SIGXFSZ):
+        assert not ignored & (1 << (signum - 1))
+
+
+@pytest.mark.skipif(not hasattr(os, "posix_spawn"), reason="Requires posix_spawn")
+def test_spawn_kills_child_on_interrupt(monkeypatch):
+    """Test that an interrupted wait kills and reaps the child."""
+    pids = []
+
+    def posix_spawn(*args, **kwargs):
+        pids.append(os_posix_spawn(*args, **kwargs))
+        return pids[-1]
+
+    os_posix_spawn = os.posix_spawn
+    monkeypatch.setattr(os, "posix_spawn", posix_spawn)
+
+    timer = threading.Timer(0.2, os.kill, (os.getpid(), signal.SIGINT))
+    timer.start()
+    with pytest.raises(KeyboardInterrupt):
+        utils._spawn([shutil.which("sleep"), "30"])
+    timer.join()
+
+    with pytest.raises(ProcessLookupError):
+        os.kill(pids[0], 0)
+
+
+def _is_devnull(fd):
+    return os.path.samestat(os.fstat(fd), os.stat(os.devnull))
+
+
+def test_suppress_stdout_stderr_nested():
+    """Test that only the outermost exit restores the original output."""
+    stdout, stderr = sys.stdout, sys.stderr
+    utils._devnull()
+    open_fds = os.listdir("/dev/fd")
+
+    with utils.suppress_stdout_stderr():
+        with utils.suppress_stdout_stderr():
+            pass
+        assert _is_devnull(1) and _is_devnull(2)
+        assert sys.stdout is not stdout and sys.stderr is not stderr
+
+    assert not _is_devnull(1) and not _is_devnull(2)
+    assert sys.stdout is stdout and sys.stderr is stderr
+    assert os.listdir("/dev/fd") == open_fds
+
+
+def test_suppress_stdout_stderr_threads():
+    """Test that overlapping threads restore the original output once both exit."""
+    stdout, stderr = sys.stdout, sys.stderr
+    utils._devnull()
+    open_fds = os.listdir("/dev/fd")
+
+    entered_a, entered_b, exited_a = (threading.Event() for _ in range(3))
+    suppressed_after_a = []
+
+    def run_a():
+        with utils.suppress_stdout_stderr():
+            entered_a.set()
+            entered_b.wait(5)
+        exited_a.set()
+
+    def run_b():
+        entered_a.wait(5)
+        with utils.suppress_stdout_stderr():
+            entered_b.set()
+            exited_a.wait(5)
+            suppressed_after_a.append(_is_devnull(1) and sys.stdout is not stdout)
+
+    threads = [threading.Thread(target=run_a), threading.Thread(target=run_b)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert suppressed_after_a == [True]
+    assert not _is_devnull(1) and not _is_devnull(2)
+    assert sys.stdout is stdout and sys.stderr is stderr
+    assert os.listdir("/dev/fd") == open_fds
+
+
+def test_run_binary_to_file(tmp_path, monkeypatch):
+    """Test that stdout and stderr of a binary end up in the log file."""
+    monkeypatch.setattr(utils, "_binary_exe", lambda binary_name: sys.executable)
+
+    log_path = tmp_path / "log"
+    script = "import sys; print('to stdout'); print('to stderr', file=sys.stderr)"
+    assert utils.run_binary_to_file("python", ["-c", script], log_path) == 0
+
+    log = log_path.read_text()
+    assert "to stdout" in log
+    assert "to stderr" in log
+
+
+def test_run_binaries_parallel(monkeypatch):
+    """Test that return codes are reported in the order of the specs."""
+    monkeypatch.setattr(utils, "_binary_exe", lambda binary_name: sys.executable)
+
+    # The first run finishes last, so completion order differs from input order
+    specs = [("python", ["-c", "import time, sys; time.sleep(0.5); sys.exit(3)"])]
+    specs.extend(("python", ["-c", f"import sys; sys.exit({i})"]) for i in range(3))
+    assert utils.run_binaries_parallel(specs, max_workers=4) == [3, 0, 1, 2]
+
+
+def test_prewarm_fd_table():
+    """Test that prewarming leaves no additional file descriptors open."""
+    open_fds = os.listdir("/dev/fd")
+    utils.prewarm_fd_table(2048)
+    utils.prewarm_fd_table(10**9)
+    assert os.listdir("/dev/fd") == open_fds
+
+
+@pytest.mark.skipif(not hasattr(os, "posix_spawn"), reason="Requires posix_spawn")
+def test_spawn_interrupt_after_reap(monkeypatch):
+    """Test that an interrupt after the child was reaped is not masked."""
+    os_waitpid = os.waitpid
+
+    def waitpid(pid, options):
+        os_waitpid(pid, options)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(os, "waitpid", waitpid)
+    with pytest.raises(KeyboardInterrupt):
+        utils._spawn([shutil.which("true")])